@@ -5,6 +5,7 @@ import (
 	"fmt"
 	"io/ioutil"
 	"regexp"
+	"time"
 )
 
 type projectConfig struct {
@@ -29,6 +30,7 @@ type Rule struct {
 		Address string				`json:"address"`
 	} `json:"targets"`
 	Timeout		uint64 				`json:"timeout"`
+	TimeoutDur	time.Duration		`json:"-"`
 	Blacklist	map[string]bool		`json:"blacklist"`
 }
 
@@ -56,6 +58,13 @@ func init() {
 }
 
 func (c *Rule) verify() error {
+	//超时换算放在最前面，保证任何校验失败返回前都已设置
+	if c.Mode == "regex" {
+		if c.Timeout == 0 {
+			c.Timeout = 500
+		}
+	}
+	c.TimeoutDur = time.Millisecond * time.Duration(c.Timeout)
 	if c.Name == "" {
 		return fmt.Errorf("empty name")
 	}
@@ -65,11 +74,6 @@ func (c *Rule) verify() error {
 	if len(c.Targets) == 0 {
 		return fmt.Errorf("invalid targets")
 	}
-	if c.Mode == "regex" {
-		if c.Timeout == 0 {
-			c.Timeout = 500
-		}
-	}
 	for i, v := range c.Targets {
 		if v.Address == "" {
 			return fmt.Errorf("invalid address at pos %d", i)
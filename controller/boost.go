@@ -1,6 +1,7 @@
 package controller
 
 import (
+	"context"
 	"go.uber.org/zap"
 	"io"
 	"moto/config"
@@ -10,19 +11,27 @@ import (
 )
 
 func HandleBoost(conn net.Conn, rule *config.Rule) {
+	handleBoost(conn, rule, conn.RemoteAddr().String())
+}
+
+//轮询模式失败后回退到智能加速，复用已格式化的客户端地址
+func handleBoost(conn net.Conn, rule *config.Rule, remoteAddr string) {
 	defer conn.Close()
 
 	decusionBegin := time.Now()
 	//智能选择最先连上的优质线路。 未用的TCP主动关闭连接。
 	//决策时间超过timeout主动关闭，超过300ms🚀没有意义
+	//所有线路共用同一个决策截止时间，拨号和等待都受其约束
+	ctx, cancel := context.WithTimeout(context.Background(), rule.TimeoutDur)
+	defer cancel()
 	switchBetter := make(chan net.Conn)
 	for _, v := range rule.Targets {
 		go func(address string) {
-			if tryGetQuickConn, err := net.Dial("tcp", address); err == nil {
-				timeout := time.NewTimer(time.Millisecond * time.Duration(rule.Timeout))
+			var d net.Dialer
+			if tryGetQuickConn, err := d.DialContext(ctx, "tcp", address); err == nil {
 				select {
 				case switchBetter <- tryGetQuickConn:
-				case <-timeout.C:
+				case <-ctx.Done():
 					tryGetQuickConn.Close()
 				}
 			}
@@ -30,20 +39,22 @@ func HandleBoost(conn net.Conn, rule *config.Rule) {
 	}
 	//全部连接失败： 最恶劣的情况，全部线路延迟大或中断。主动结束该TCP协程任务！
 	var target net.Conn
-	timeout := time.NewTimer(time.Millisecond * time.Duration(rule.Timeout))
 	select {
 	case target = <-switchBetter:
-	case <-timeout.C:
+	case <-ctx.Done():
 		utils.Logger.Error("Boost Decision Failed！All Online Network Disconnect!",
-			zap.String("ruleName", rule.Name))
+			zap.String("ruleName", rule.Name),
+			zap.String("remoteAddr", remoteAddr))
 		return
 	}
+	//已选出线路，立即取消其余拨号并关闭落选连接，不必等到截止时间
+	cancel()
 
 	utils.Logger.Debug("establish connection",
 		zap.String("ruleName", rule.Name),
-		zap.String("remoteAddr", conn.RemoteAddr().String()),
+		zap.String("remoteAddr", remoteAddr),
 		zap.String("targetAddr", target.RemoteAddr().String()),
-		zap.Int64("decisionTime(ms)", time.Now().Sub(decusionBegin).Milliseconds()))
+		zap.Int64("decisionTime(ms)", time.Since(decusionBegin).Milliseconds()))
 
 	defer target.Close()
 
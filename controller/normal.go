@@ -10,6 +10,7 @@ import (
 
 func HandleNormal(conn net.Conn, rule *config.Rule) {
 	defer conn.Close()
+	remoteAddr := conn.RemoteAddr().String()
 
 	var target net.Conn
 	//正常模式下挨个连接直到成功连接
@@ -18,7 +19,7 @@ func HandleNormal(conn net.Conn, rule *config.Rule) {
 		if err != nil {
 			utils.Logger.Error("unable to establish connection, try next target",
 				zap.String("ruleName", rule.Name),
-				zap.String("remoteAddr", conn.RemoteAddr().String()),
+				zap.String("remoteAddr", remoteAddr),
 				zap.String("targetAddr", v.Address))
 			continue
 		}
@@ -28,12 +29,12 @@ func HandleNormal(conn net.Conn, rule *config.Rule) {
 	if target == nil {
 		utils.Logger.Error("all targets connected failed，so can't to handle connection",
 			zap.String("ruleName", rule.Name),
-			zap.String("remoteAddr", conn.RemoteAddr().String()))
+			zap.String("remoteAddr", remoteAddr))
 		return
 	}
 	utils.Logger.Debug("establish connection",
 		zap.String("ruleName", rule.Name),
-		zap.String("remoteAddr", conn.RemoteAddr().String()),
+		zap.String("remoteAddr", remoteAddr),
 		zap.String("targetAddr", target.RemoteAddr().String()))
 
 	defer target.Close()
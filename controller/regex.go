@@ -10,32 +10,59 @@ import (
 	"time"
 )
 
+//首包缓冲区大小，按常见HTTP服务器的请求头上限8KB预留，
+//足以读到HTTP代理的Proxy-Connection等位于请求头后部的特征
+const firstPacketSize = 8192
+
+//HTTP请求头结束标记
+var httpHeaderEnd = []byte("\r\n\r\n")
+
 func HandleRegexp(conn net.Conn, rule *config.Rule) {
 	defer conn.Close()
+	remoteAddr := conn.RemoteAddr().String()
 
 	//正则模式下需要客户端的第一个数据包判断特征，所以需要设置一个超时
-	conn.SetReadDeadline(time.Now().Add(time.Millisecond * time.Duration(rule.Timeout)))
-	//获取第一个数据包
-	firstPacket := new(bytes.Buffer)
-	if count, _ := io.Copy(firstPacket, conn); count == 0 {
+	conn.SetReadDeadline(time.Now().Add(rule.TimeoutDur))
+	//获取第一个数据包：边读边匹配，规则顺序即优先级。
+	//命中第一条规则，或已命中其他规则且HTTP请求头已读完时立即停止，不必等到超时；
+	//否则继续读（排在前面的规则可能在后续TCP分段中命中），直到缓冲区满、超时或EOF
+	firstPacket := make([]byte, 0, firstPacketSize)
+	var matched []string
+	for len(firstPacket) < cap(firstPacket) {
+		n, err := conn.Read(firstPacket[len(firstPacket):cap(firstPacket)])
+		first := -1
+		if n > 0 {
+			firstPacket = firstPacket[:len(firstPacket)+n]
+			//挨个匹配正则
+			matched = matched[:0]
+			for i, v := range rule.Targets {
+				if v.Re.Match(firstPacket) {
+					if first < 0 {
+						first = i
+					}
+					matched = append(matched, v.Address)
+				}
+			}
+		}
+		if err != nil || first == 0 || (first > 0 && bytes.Contains(firstPacket, httpHeaderEnd)) {
+			break
+		}
+	}
+	if len(firstPacket) == 0 {
 		utils.Logger.Error("unable to handle connection, failed to get first packet",
 			zap.String("ruleName", rule.Name),
-			zap.String("remoteAddr", conn.RemoteAddr().String()))
+			zap.String("remoteAddr", remoteAddr))
 		return
 	}
 
 	var target net.Conn
-	//挨个匹配正则
-	for _, v := range rule.Targets {
-		if !v.Re.Match(firstPacket.Bytes()) {
-			continue
-		}
-		c, err := net.Dial("tcp", v.Address)
+	for _, address := range matched {
+		c, err := net.Dial("tcp", address)
 		if err != nil {
 			utils.Logger.Error("unable to establish connection",
 				zap.String("ruleName", rule.Name),
-				zap.String("remoteAddr", conn.RemoteAddr().String()),
-				zap.String("targetAddr", v.Address))
+				zap.String("remoteAddr", remoteAddr),
+				zap.String("targetAddr", address))
 			continue
 		}
 		target = c
@@ -44,18 +71,18 @@ func HandleRegexp(conn net.Conn, rule *config.Rule) {
 	if target == nil {
 		utils.Logger.Error("can't match target , so can't handle connection",
 			zap.String("ruleName", rule.Name),
-			zap.String("remoteAddr", conn.RemoteAddr().String()))
+			zap.String("remoteAddr", remoteAddr))
 		return
 	}
 
 	utils.Logger.Debug("establish connection",
 		zap.String("ruleName", rule.Name),
-		zap.String("remoteAddr", conn.RemoteAddr().String()),
+		zap.String("remoteAddr", remoteAddr),
 			zap.String("targetAddr", target.RemoteAddr().String()))
 	//匹配到了，去除掉刚才设定的超时
 	conn.SetReadDeadline(time.Time{})
 	//把第一个数据包发送给目标
-	io.Copy(target, firstPacket)
+	target.Write(firstPacket)
 
 	defer target.Close()
 
@@ -0,0 +1,143 @@
+package controller
+
+import (
+	"bytes"
+	"encoding/json"
+	"io"
+	"moto/config"
+	"net"
+	"regexp"
+	"testing"
+	"time"
+)
+
+//按正则顺序为每个目标启动一个本地监听，构造正则模式规则
+func newRegexRule(t *testing.T, timeout time.Duration, patterns ...string) (*config.Rule, []*net.TCPListener) {
+	t.Helper()
+	var listeners []*net.TCPListener
+	var targets []map[string]string
+	for _, p := range patterns {
+		l, err := net.Listen("tcp", "127.0.0.1:0")
+		if err != nil {
+			t.Fatal(err)
+		}
+		t.Cleanup(func() { l.Close() })
+		listeners = append(listeners, l.(*net.TCPListener))
+		targets = append(targets, map[string]string{"regexp": p, "address": l.Addr().String()})
+	}
+	buf, err := json.Marshal(map[string]interface{}{"targets": targets})
+	if err != nil {
+		t.Fatal(err)
+	}
+	rule := &config.Rule{Name: "test", Mode: "regex", TimeoutDur: timeout}
+	if err := json.Unmarshal(buf, rule); err != nil {
+		t.Fatal(err)
+	}
+	for _, v := range rule.Targets {
+		v.Re = regexp.MustCompile(v.Regexp)
+	}
+	return rule, listeners
+}
+
+//在within时间内等待目标收到want，超时则失败
+func expectForwarded(t *testing.T, l *net.TCPListener, within time.Duration, want []byte) {
+	t.Helper()
+	l.SetDeadline(time.Now().Add(within))
+	c, err := l.Accept()
+	if err != nil {
+		t.Fatalf("target %s not connected: %v", l.Addr(), err)
+	}
+	defer c.Close()
+	c.SetReadDeadline(time.Now().Add(within))
+	got := make([]byte, len(want))
+	if _, err := io.ReadFull(c, got); err != nil {
+		t.Fatalf("target %s read: %v", l.Addr(), err)
+	}
+	if !bytes.Equal(got, want) {
+		t.Fatalf("target %s got %q, want %q", l.Addr(), got, want)
+	}
+}
+
+//在within时间内确认目标没有收到连接
+func expectNotConnected(t *testing.T, l *net.TCPListener, within time.Duration) {
+	t.Helper()
+	l.SetDeadline(time.Now().Add(within))
+	if c, err := l.Accept(); err == nil {
+		c.Close()
+		t.Fatalf("target %s unexpectedly connected", l.Addr())
+	}
+}
+
+//在within时间内确认客户端连接被关闭
+func expectClosed(t *testing.T, client net.Conn, within time.Duration) {
+	t.Helper()
+	client.SetReadDeadline(time.Now().Add(within))
+	if _, err := client.Read(make([]byte, 1)); err != io.EOF {
+		t.Fatalf("client not closed, read err: %v", err)
+	}
+}
+
+func startRegexp(rule *config.Rule) net.Conn {
+	client, server := net.Pipe()
+	go HandleRegexp(server, rule)
+	return client
+}
+
+func TestRegexpMatchFirstSegment(t *testing.T) {
+	rule, ls := newRegexRule(t, 5*time.Second, "^GET", "^SSH")
+	client := startRegexp(rule)
+	defer client.Close()
+
+	req := []byte("GET / HTTP/1.1\r\n")
+	client.Write(req)
+	//命中第一条规则不需要等到超时
+	expectForwarded(t, ls[0], time.Second, req)
+}
+
+func TestRegexpMatchSplitAcrossReads(t *testing.T) {
+	rule, ls := newRegexRule(t, 5*time.Second, "Proxy-Connection:", "^GET")
+	client := startRegexp(rule)
+	defer client.Close()
+
+	part1 := []byte("GET http://example.com/ HTTP/1.1\r\nHost: example.com\r\n")
+	part2 := []byte("Proxy-Connection: keep-alive\r\n\r\n")
+	client.Write(part1)
+	time.Sleep(50 * time.Millisecond)
+	client.Write(part2)
+	//排在前面的规则在第二个分段才命中，仍应优先
+	expectForwarded(t, ls[0], time.Second, append(part1, part2...))
+	expectNotConnected(t, ls[1], 100*time.Millisecond)
+}
+
+func TestRegexpLaterRuleAtHeaderEnd(t *testing.T) {
+	rule, ls := newRegexRule(t, 5*time.Second, "Proxy-Connection:", "^GET")
+	client := startRegexp(rule)
+	defer client.Close()
+
+	req := []byte("GET / HTTP/1.1\r\nHost: example.com\r\n\r\n")
+	client.Write(req)
+	//请求头已完整，不需要等到超时
+	expectForwarded(t, ls[1], time.Second, req)
+	expectNotConnected(t, ls[0], 100*time.Millisecond)
+}
+
+func TestRegexpNoMatchBeforeDeadline(t *testing.T) {
+	rule, ls := newRegexRule(t, 200*time.Millisecond, "^SSH")
+	client := startRegexp(rule)
+	defer client.Close()
+
+	client.Write([]byte("GET / HTTP/1.1\r\n"))
+	expectClosed(t, client, time.Second)
+	expectNotConnected(t, ls[0], 100*time.Millisecond)
+}
+
+func TestRegexpFullBuffer(t *testing.T) {
+	rule, ls := newRegexRule(t, 5*time.Second, "^SSH")
+	client := startRegexp(rule)
+	defer client.Close()
+
+	client.Write(bytes.Repeat([]byte("a"), firstPacketSize))
+	//缓冲区已满仍未命中，不需要等到超时
+	expectClosed(t, client, time.Second)
+	expectNotConnected(t, ls[0], 100*time.Millisecond)
+}
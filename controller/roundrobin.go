@@ -6,37 +6,35 @@ import (
 	"moto/config"
 	"moto/utils"
 	"net"
+	"sync/atomic"
 	"time"
 )
 
-var tcpCounter = 0
+//多个协程并发轮询，使用原子计数器，无需加锁
+var tcpCounter uint64
 
 func HandleRoundrobin(conn net.Conn, rule *config.Rule) {
 	defer conn.Close()
+	remoteAddr := conn.RemoteAddr().String()
 
-	v := rule.Targets[tcpCounter % len(rule.Targets)]
-	if tcpCounter >= 100*len(rule.Targets) {
-		tcpCounter = 1
-	} else {
-		tcpCounter += 1
-	}
+	v := rule.Targets[(atomic.AddUint64(&tcpCounter, 1)-1)%uint64(len(rule.Targets))]
 
 	roundrobinBegin := time.Now()
 	target, err := net.Dial("tcp", v.Address)
 	if err != nil {
 		utils.Logger.Error("unable to establish connection, Smart switch boost mode",
 			zap.String("ruleName", rule.Name),
-			zap.String("remoteAddr", conn.RemoteAddr().String()),
+			zap.String("remoteAddr", remoteAddr),
 			zap.String("targetAddr", v.Address),
-			zap.Int64("failedTime(ms)", time.Now().Sub(roundrobinBegin).Milliseconds()))
-		HandleBoost(conn, rule)
+			zap.Int64("failedTime(ms)", time.Since(roundrobinBegin).Milliseconds()))
+		handleBoost(conn, rule, remoteAddr)
 		return
 	}
 	utils.Logger.Debug("establish connection",
 		zap.String("ruleName", rule.Name),
-		zap.String("remoteAddr", conn.RemoteAddr().String()),
+		zap.String("remoteAddr", remoteAddr),
 		zap.String("targetAddr", target.RemoteAddr().String()),
-		zap.Int64("roundrobinTime(ms)", time.Now().Sub(roundrobinBegin).Milliseconds()))
+		zap.Int64("roundrobinTime(ms)", time.Since(roundrobinBegin).Milliseconds()))
 
 	defer target.Close()
 